@@ -2,15 +2,60 @@ from browser_use import Agent
 from langchain_openai import ChatOpenAI
 import pandas as pd
 from dotenv import load_dotenv
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
+from waitress import serve
+import multiprocessing
 import threading
 import time
+import csv
+import os
 
 app = Flask(__name__)
 
-class AI_Tool_Surveyor():
+COLUMNS = ["Service Name", "Domain", "Source Category", "Source URL", "Service Type", "Service Category"]
+OUTPUT_CSV = "aixploria_survey.csv"
+
+# Rows received from the agent; lives in the server process
+class Survey_Store():
     def __init__(self) -> None:
-        self.df = pd.DataFrame(columns=["Service Name", "Domain", "Source Category", "Source URL", "Service Type", "Service Category"])
+        self._rows: list[dict] = []
+        self._lock = threading.Lock()
+        # Resume from rows saved by a previous run and keep appending to the same file
+        if os.path.isfile(OUTPUT_CSV):
+            with open(OUTPUT_CSV, "r", newline="", encoding="utf-8") as f:
+                self._rows.extend(csv.DictReader(f))
+        self._out = open(OUTPUT_CSV, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._out, fieldnames=COLUMNS)
+        if self._out.tell() == 0:
+            self._writer.writeheader()
+        # Shared with the agent process so it knows where to resume
+        self.rows_done = multiprocessing.Value("i", len(self._rows))
+
+    @property
+    def df(self):
+        # Built on demand; appending rows to a DataFrame one at a time is quadratic
+        return pd.DataFrame(self._rows, columns=COLUMNS)
+
+    def update_dataframe(self, service_name, domain, source_category, source_url, service_type, service_category):
+        new_entry = {
+            "Service Name": service_name,
+            "Domain": domain,
+            "Source Category": source_category,
+            "Source URL": source_url,
+            "Service Type": service_type,
+            "Service Category": service_category
+        }
+        with self._lock:
+            self._rows.append(new_entry)
+            # Persist every row as it arrives so progress survives a crash
+            self._writer.writerow(new_entry)
+            self._out.flush()
+            self.rows_done.value = len(self._rows)
+        print("Updated rows:", self._rows[-5:])  # Print the last few entries
+
+class AI_Tool_Surveyor():
+    def __init__(self, rows_done) -> None:
+        self.rows_done = rows_done  # Count of rows the server has saved so far
         self.index = 1  # Start at the first tool
         self.total_tools = 3643
         self.tools_per_page = 12
@@ -20,8 +65,8 @@ class AI_Tool_Surveyor():
         self.create_new_agent()
     
     def create_new_agent(self):
-        if not self.df.empty:
-            self.index = len(self.df) + 1  # Resume from the last index
+        if self.rows_done.value:
+            self.index = self.rows_done.value + 1  # Resume from the last index
         page_number = (self.index - 1) // self.tools_per_page + 1
         self.website = f"https://www.aixploria.com/en/category/last-ai-en/page/{page_number}"
         self.agent = Agent(
@@ -43,7 +88,7 @@ class AI_Tool_Surveyor():
             6. Navigate to the “Visit Site” button and click it. It will take you to the source of the AI tool. 
             7. Note down the current URL you are at. That will be the “Domain of the service”. Remember this URL, you will use it in a few steps. 
             8. If you have not inferred the “Service Type” and “Service Category”, do so now using the data available to you on the webpage. Infer the “Source Category” from the data available to you on the webpage. Remember your inferences. You will use them in a few steps. 
-            9. In this step you will build a URL and type it into the current browser window, and then visit that URL. Do NOT leave any part of the URL blank, fill in every part. The URL domain will be http://localhost:5000/update/<Service_Name>/<Domain>/<Source_Category>/<Source_URL>/<Service_Type>/<Service_Category>
+            9. In this step you will build a URL and type it into the current browser window, and then visit that URL. Do NOT leave any part of the URL blank, fill in every part. Percent-encode every value before putting it in the URL (e.g. encode "&" as %26, "=" as %3D, "#" as %23, "+" as %2B, "/" as %2F, ":" as %3A, "?" as %3F and spaces as %20), so URLs and names containing these characters arrive intact. The URL will be http://localhost:5000/update?service_name=<Service_Name>&domain=<Domain>&source_category=<Source_Category>&source_url=<Source_URL>&service_type=<Service_Type>&service_category=<Service_Category>
             10. Return back to {self.website}. Complete steps 3-7, for the next tool that you have not yet surveyed. If you have surveyed all the tools available on the current page, move to the next page and start with the first tool on that page. If there are no more tools to survey, the task is complete.
             """,
             llm=ChatOpenAI(model="gpt-4o"),
@@ -56,40 +101,43 @@ class AI_Tool_Surveyor():
             print("Restarting agent...")
             self.create_new_agent()
 
-    def update_dataframe(self, service_name, domain, source_category, source_url, service_type, service_category):
-        new_entry = pd.DataFrame([{ 
-            "Service Name": service_name, 
-            "Domain": domain, 
-            "Source Category": source_category, 
-            "Source URL": source_url, 
-            "Service Type": service_type, 
-            "Service Category": service_category
-        }])
-        self.df = pd.concat([self.df, new_entry], ignore_index=True)
-        print("Updated DataFrame:", self.df.tail(5))  # Print the last few entries
+UPDATE_FIELDS = ["service_name", "domain", "source_category", "source_url", "service_type", "service_category"]
 
-@app.route('/update/<service_name>/<domain>/<source_category>/<source_url>/<service_type>/<service_category>', methods=['GET'])
-def receive_data(service_name, domain, source_category, source_url, service_type, service_category):
+# POST takes a JSON object or a list of them; GET takes query parameters so the browser agent
+# can submit by visiting a URL. Unlike path segments, query values may contain "/".
+@app.route('/update', methods=['GET', 'POST'])
+def receive_data():
     try:
-        survey_agent.update_dataframe(service_name, domain, source_category, source_url, service_type, service_category)
-        return jsonify({"message": "Data received and DataFrame updated"}), 200
+        if request.method == 'POST':
+            body = request.get_json()
+            records = body if isinstance(body, list) else [body]
+        else:
+            records = [request.args]
+        for record in records:
+            missing = [field for field in UPDATE_FIELDS if not record.get(field)]
+            if missing:
+                return jsonify({"error": f"missing fields: {', '.join(missing)}"}), 400
+        for record in records:
+            survey_store.update_dataframe(*(record[field] for field in UPDATE_FIELDS))
+        return jsonify({"message": f"Received {len(records)} record(s) and updated the DataFrame"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-survey_agent = AI_Tool_Surveyor()
+survey_store = None  # Created in the server process only
 
-def run_agent():
-    survey_agent.run()
+def run_agent(rows_done):
+    AI_Tool_Surveyor(rows_done).run()
 
 def run_server():
-    app.run(port=5000, debug=True, use_reloader=False)
+    serve(app, host="127.0.0.1", port=5000, threads=8)
 
 if __name__ == "__main__":
-    server_thread = threading.Thread(target=run_server)
-    agent_thread = threading.Thread(target=run_agent)
-    
-    server_thread.start()
-    agent_thread.start()
-    
-    server_thread.join()
-    agent_thread.join()
+    survey_store = Survey_Store()
+
+    # The LLM and browser automation get their own interpreter so they never hold the
+    # GIL while the server is handling callbacks
+    agent_process = multiprocessing.Process(target=run_agent, args=(survey_store.rows_done,))
+    agent_process.start()
+
+    run_server()
+    agent_process.join()
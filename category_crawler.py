@@ -1,49 +1,72 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+import asyncio
 import csv
 import os
+from http_session import make_session, fetch, parse_page
 
-def get_all_category_links(url):
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-    try:
-        driver.get(url)
 
-        # Wait for the category blocks to appear
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a[target='_blank'][href*='/category/']"))
+# Returns None when the seed page could not be loaded
+async def get_all_category_links(session, url):
+    html = await fetch(session, url)
+    if not html:
+        return None
+
+    anchors = parse_page(html, url).cssselect("a[target='_blank'][href*='/category/']")
+    category_links = []
+    seen_urls = set()
+
+    for anchor in anchors:
+        href = anchor.get("href")
+        if href and href.startswith("https://www.aixploria.com/en/category/"):
+            if href not in seen_urls:
+                category_links.append(href)
+                seen_urls.add(href)
+
+    return category_links
+
+
+async def main(in_csv="aixploria_categories.csv", out_csv="aixploria_categories.csv"):
+    with open(in_csv, "r", newline="", encoding="utf-8") as f1:
+        seed_urls = [row["Category URL"] for row in csv.DictReader(f1)]
+
+    async with make_session() as session:
+        results = await asyncio.gather(
+            *(get_all_category_links(session, url) for url in seed_urls),
+            return_exceptions=True,
         )
 
-        anchors = driver.find_elements(By.CSS_SELECTOR, "a[target='_blank'][href*='/category/']")
-        category_links = []
+    # Union of the category links found from every seed page, in first-seen order
+    links = []
+    seen = set()
+    failed = 0
+    for url, found in zip(seed_urls, results):
+        if found is None or isinstance(found, Exception):
+            print(f"Error loading categories from {url}" + (f": {found}" if found else ""))
+            failed += 1
+            continue
+        for link in found:
+            if link not in seen:
+                seen.add(link)
+                links.append(link)
+
+    print(f"Found {len(links)} categories.")
+    for link in links:
+        print(link)
 
-        for anchor in anchors:
-            href = anchor.get_attribute("href")
-            if href and href.startswith("https://www.aixploria.com/en/category/"):
-                if href not in category_links:
-                    category_links.append(href)
+    # Input and output may be the same file, and crawler.py reads it too, so never
+    # replace it with a partial or empty list
+    if failed or not links:
+        print(f"{failed} of {len(seed_urls)} seed pages failed to load; leaving {out_csv} unchanged.")
+        return
 
-        return category_links
-    finally:
-        driver.quit()
+    # Write everything once and swap it in
+    tmp_csv = out_csv + ".tmp"
+    with open(tmp_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Category URL"])
+        for link in links:
+            writer.writerow([link])
+    os.replace(tmp_csv, out_csv)
 
 
 if __name__ == "__main__":
-    with open("aixploria_categories.csv", "r", newline="", encoding="utf-8") as f1:
-        for category_url in f1["Category URL"]:
-            links = get_all_category_links(category_url)
-
-            print(f"Found {len(links)} categories.")
-            for link in links:
-                print(link)
-
-            # Optional: write to CSV
-            with open("aixploria_categories.csv", "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(["Category URL"])
-                for link in links:
-                    writer.writerow([link])
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from multiprocessing import util
+from urllib.parse import urlparse
+import atexit
+import os
+import time
+
+# Selenium Manager resolves chromedriver on its own; set CHROMEDRIVER_PATH to pin a binary
+CHROMEDRIVER_PATH = os.environ.get("CHROMEDRIVER_PATH")
+
+# Driver and browser binaries found by the first launch in this process
+_driver_path = CHROMEDRIVER_PATH
+_browser_path = None
+
+# Images, fonts and media: heavy to download and never looked at by any crawler
+MEDIA_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.mp3",
+]
+
+# Subresources the listing crawlers never parse; blocking them keeps page loads small
+BLOCKED_URLS = MEDIA_URLS + [
+    "*googletagmanager*", "*google-analytics*", "*doubleclick*",
+]
+
+
+# One browser per process, reused across pages; recreated only if its session is lost
+_DRIVER = None
+
+
+def get_driver(factory):
+    # factory() builds the browser the first time this process needs one
+    global _DRIVER
+    if _DRIVER is None:
+        _DRIVER = factory()
+    return _DRIVER
+
+
+def reset_driver():
+    global _DRIVER
+    if _DRIVER is not None:
+        try:
+            _DRIVER.quit()
+        except Exception:
+            pass
+    _DRIVER = None
+
+
+atexit.register(reset_driver)
+
+
+def register_driver_cleanup():
+    # Pool workers skip atexit hooks, so call this from the pool initializer to quit the
+    # driver from a finalizer instead. Don't start the driver there: if Chrome cannot start,
+    # the pool would respawn the dying worker forever.
+    util.Finalize(None, reset_driver, exitpriority=10)
+
+
+# Earliest time this process may next hit each domain
+_NEXT_REQUEST = {}
+
+
+def wait_for_slot(url, gap):
+    # Sleep until this process may load url: at most one page load per gap seconds to each
+    # domain. Time spent loading the previous page counts toward the gap, so slow sites add
+    # no extra idle time.
+    domain = urlparse(url).netloc
+    now = time.monotonic()
+    slot = max(now, _NEXT_REQUEST.get(domain, now))
+    _NEXT_REQUEST[domain] = slot + gap
+    if slot > now:
+        time.sleep(slot - now)
+
+
+def make_options():
+    opts = Options()
+    opts.add_argument("--headless=new")
+    opts.add_argument("--disable-gpu")
+    opts.add_argument("--disable-dev-shm-usage")
+    opts.add_argument("--blink-settings=imagesEnabled=false")
+    opts.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+    })
+    return opts
+
+
+def start_chrome(options):
+    # Selenium Manager only has to look the binaries up once per process; later
+    # launches (e.g. a worker restarting a lost session) reuse what it found
+    global _driver_path, _browser_path
+    if _browser_path and not options.binary_location:
+        options.binary_location = _browser_path
+    driver = webdriver.Chrome(service=Service(_driver_path), options=options)
+    _driver_path = driver.service.path
+    _browser_path = options.binary_location or _browser_path
+    return driver
+
+
+def build_driver():
+    driver = start_chrome(make_options())
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    return driver
@@ -1,85 +1,84 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+import asyncio
+import re
 import csv
 import os
+from http_session import make_session, fetch, parse_page, fetch_more_pages
 
-def get_all_tool_links_from_category(driver, category_url):
-    tool_links = []
-    page = 1
+PAGE_SIZE = 12  # aixploria lists 12 tools per category page
+PAGE_RE = re.compile(r"/page/(\d+)/?$")
 
-    while True:
-        url = f"{category_url}page/{page}/" if page > 1 else category_url
-        print(f"Visiting: {url}")
-        driver.get(url)
 
-        try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "dark-title"))
-            )
-        except:
-            print(f"No tools found on page {page}. Stopping.")
-            break
+# Returns (tool_links, card_count) for a single listing page
+def get_tool_links_from_page(tree):
+    anchors = tree.cssselect("a.dark-title")
+    return [a.get("href") for a in anchors if a.get("href")], len(anchors)
 
-        # Extract all tool links on the current page
-        anchors = driver.find_elements(By.CLASS_NAME, "dark-title")
-        if not anchors:
-            break
 
-        for anchor in anchors:
-            href = anchor.get_attribute("href")
-            if href:
-                tool_links.append(href)
+async def get_all_tool_links_from_category(session, category_url):
+    print(f"Visiting: {category_url}")
+    html = await fetch(session, category_url)
+    if not html:
+        print(f"No tools found on {category_url}.")
+        return []
 
-        # Check if there is a next page by seeing if the current page has exactly 12 tools
-        if len(anchors) < 12:
-            break
+    tree = parse_page(html, category_url)
+    tool_links, card_count = get_tool_links_from_page(tree)
 
-        page += 1
+    # Fewer than a full page of tools means there is nothing to paginate
+    if card_count < PAGE_SIZE:
+        return tool_links
 
+    tool_links += await fetch_more_pages(
+        session, tree, category_url, lambda page: f"{category_url}page/{page}/",
+        PAGE_RE, PAGE_SIZE, get_tool_links_from_page,
+    )
     return tool_links
 
 
-def get_source_url_from_tool_page(driver, tool_url):
-    driver.get(tool_url)
-    try:
-        # Wait for the main button to appear
-        button = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, "specialButton"))
-        )
-        return button.get_attribute("href")
-    except:
-        print(f"Could not get source URL for {tool_url}")
-        return None
+async def get_source_url_from_tool_page(session, tool_url):
+    html = await fetch(session, tool_url)
+    if html:
+        tree = parse_page(html, tool_url)
+        buttons = tree.cssselect("#specialButton")
+        if buttons and buttons[0].get("href"):
+            return buttons[0].get("href")
+    print(f"Could not get source URL for {tool_url}")
+    return None
 
 
-def scrape_category(category_url):
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-    try:
-        tool_pages = get_all_tool_links_from_category(driver, category_url)
-        print(f"Found {len(tool_pages)} tools in category.")
-        return tool_pages
-    finally:
-        driver.quit()
+async def scrape_category(session, category_url):
+    tool_pages = await get_all_tool_links_from_category(session, category_url)
+    print(f"Found {len(tool_pages)} tools in category.")
+    return tool_pages
+
+
+def tool_rows(categories, results):
+    for category, source_urls in zip(categories, results):
+        if isinstance(source_urls, Exception):
+            print(f"Error scraping {category}: {source_urls}")
+            continue
+        for tool_page in source_urls:
+            yield [tool_page, category]  # Write both
+
+
+async def main():
+    with open("aixploria_categories.csv", "r", newline="", encoding="utf-8") as f1:
+        categories = [row["Category URL"] for row in csv.DictReader(f1)]
+
+    async with make_session() as session:
+        results = await asyncio.gather(
+            *(scrape_category(session, category) for category in categories),
+            return_exceptions=True,
+        )
 
-if __name__ == "__main__":
     file_exists = os.path.isfile("aixploria_ai_tools.csv")
-    with open("aixploria_ai_tools.csv", "a", newline="", encoding="utf-8") as f:
+    with open("aixploria_ai_tools.csv", "a", newline="", encoding="utf-8", buffering=1024 * 1024) as f:
         writer = csv.writer(f)
         if not file_exists:
             writer.writerow(["Tool Page URL", "Category URL"])  # Updated header
 
-        with open("aixploria_categories.csv", "r", newline="", encoding="utf-8") as f1:
-            reader = csv.DictReader(f1)
-            for row in reader:
-                category = row["Category URL"]
-                try:
-                    source_urls = scrape_category(category)
-                    for tool_page in source_urls:
-                        writer.writerow([tool_page, category])  # Write both
-                except Exception as e:
-                    print(f"Error scraping {category}: {e}")
\ No newline at end of file
+        writer.writerows(tool_rows(categories, results))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,4 +1,5 @@
 import pandas as pd
+import importlib.util
 import csv
 
 # futurepedia = pd.read_csv("tool_datasets/futurepedia_tools_UPDATED.csv")
@@ -15,6 +16,12 @@ import csv
 
 # combined_df.to_csv("tool_datasets/AI_tool_master_list.csv")
 
-df = pd.read_csv("tool_datasets/AI_tool_master_list.csv")
+# Arrow-backed strings take roughly half the memory of NumPy object columns; pyarrow is optional
+if importlib.util.find_spec("pyarrow") is not None:
+    read_options = {"engine": "pyarrow", "dtype_backend": "pyarrow"}
+else:
+    read_options = {}
+
+df = pd.read_csv("tool_datasets/AI_tool_master_list.csv", **read_options)
 combined_df = df.drop(["ID", "Source URL", "Unnamed: 0"], axis=1)
 combined_df.to_csv("tool_datasets/AI_tool_master_list_FINAL.csv")
@@ -1,12 +1,27 @@
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
+from chrome_driver import build_driver, get_driver, reset_driver, register_driver_cleanup, wait_for_slot
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support.ui import WebDriverWait
-import time
+from selenium.common.exceptions import InvalidSessionIdException, TimeoutException
+from multiprocessing import Pool
+import csv
+import os
+
+INPUT_CSV = "tool_datasets/AI_tool_master_list_FINAL.csv"
+OUTPUT_CSV = "tool_datasets/FINAL_LIST.csv"
+WORKERS = 8  # Each worker process owns one Chrome instance
+DOMAIN_RATE = 16.0  # Requests per second to any one domain, summed over all workers
+
+# First outbound button link and the tool heading on a saasaitools.com tool page
+SAASAI_EXTRACT_JS = """
+const hrefs = [...document.querySelectorAll("a[class*='brxe-button']")].map(a => a.href);
+const heading = document.querySelector("h1[class*='brxe-heading']");
+return [
+    hrefs.find(h => h && !h.startsWith("https://saasaitools.com")) || null,
+    heading ? heading.innerText.trim() : null,
+];
+"""
 
 def crawl_domain(driver, url, toolName):
     title, link = None, None  # Default values
@@ -27,72 +42,113 @@ def crawl_domain(driver, url, toolName):
                 article = WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.XPATH, "//a[contains(@class, 'brxe-button')]"))
                 )
-                buttons = driver.find_elements(By.XPATH, "//a[contains(@class, 'brxe-button')]")
-                article = next(
-                    (b for b in buttons if b.get_attribute("href") and not b.get_attribute("href").startswith("https://saasaitools.com")),
-                    None
-                )
-                if article:
-                    link = article.get_attribute("href")
-                else:
-                    link = None
+                # One round trip for every button href and the heading, instead of one per attribute
+                link, title = driver.execute_script(SAASAI_EXTRACT_JS)
 
-                anchor = driver.find_element(By.XPATH, "//h1[contains(@class, 'brxe-heading')]")
-                title = anchor.text.strip()
-                
             except Exception as e:
                 print(f"Skipping one article due to error: {e}")
                 title, link = None, None
 
         elif "insidr" in url:
             try:
-                time.sleep(2)
+                # insidr tool pages redirect to the tool's own site; wait for exactly that
+                try:
+                    WebDriverWait(driver, 5).until(lambda d: "insidr.ai" not in d.current_url)
+                except TimeoutException:
+                    print(f"No redirect away from insidr for {url}")
                 link = driver.current_url
                 title = toolName
             except Exception as e:
                 print(f"Skipping one article due to error: {e}")
 
+    except InvalidSessionIdException:
+        raise
     except Exception as e:
         print(f"Error loading URL {url}: {e}")
 
     return title, link
 
-    
+
+def work(record):
+    url = record["Tool Page URL"]
+    toolName = record["Tool Name"]
+    # Each worker takes an equal share of DOMAIN_RATE
+    wait_for_slot(url, WORKERS / DOMAIN_RATE)
+    # Anything raised here would abort the whole pool, so a broken browser only costs this row
+    try:
+        try:
+            title, link = crawl_domain(get_driver(build_driver), url, toolName)
+        except InvalidSessionIdException:
+            print(f"Lost browser session on {url}, restarting driver")
+            reset_driver()
+            title, link = crawl_domain(get_driver(build_driver), url, toolName)
+        # Keep cookies from piling up across thousands of sites
+        get_driver(build_driver).delete_all_cookies()
+    except Exception as e:
+        # A dead chromedriver surfaces as urllib3 errors, not WebDriverException, so catch everything
+        print(f"Browser failed on {url}, restarting driver: {e}")
+        reset_driver()
+        title, link = None, None
+    return {**record, "Tool Name": title, "Domain": link}
+
+
+def drop_unresolved_rows(path):
+    # Older runs also wrote rows whose crawl failed. Those tools are crawled again, so rewrite
+    # the file without them (and without repeated tools) before any retry is appended next to
+    # them. Returns the Tool Page URLs that are already resolved.
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+    done = set()
+    kept = []
+    for row in rows:
+        if row.get("Domain") and row["Tool Page URL"] not in done:
+            done.add(row["Tool Page URL"])
+            kept.append(row)
+
+    if len(kept) < len(rows):
+        print(f"Dropping {len(rows) - len(kept)} unresolved or repeated rows from {path}")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=reader.fieldnames)
+            writer.writeheader()
+            writer.writerows(kept)
+        os.replace(tmp_path, path)
+    return done
 
 
 def main():
-    # Load the CSV
-    df = pd.read_csv("tool_datasets/AI_tool_master_list_FINAL.csv")
-
-    # Set up WebDriver
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-    wait = WebDriverWait(driver, 10)
-
-    # Prepare lists to store results
-    titles = []
-    links = []
-
-    # Iterate over the rows in the DataFrame
-    for _, row in df.iterrows():
-        # Ensure that you pass the correct URL (from the current row)
-        url = row["Tool Page URL"]
-        toolName = row["Tool Name"]
-        title, link = crawl_domain(driver, url, toolName)
-
-        # Append results to the lists
-        titles.append(title)
-        links.append(link)
-        time.sleep(3)
-
-    # Add the results to the DataFrame
-    df["Tool Name"] = titles
-    df["Domain"] = links
-
-    # Save the updated DataFrame to a new CSV
-    df.to_csv("tool_datasets/FINAL_LIST.csv", index=False)
-
-    # Close the driver
-    driver.quit()
+    # Load the CSV; keep every cell as text so rows round-trip unchanged through csv
+    df = pd.read_csv(INPUT_CSV, dtype=str, keep_default_na=False)
+    fieldnames = list(df.columns) + (["Domain"] if "Domain" not in df.columns else [])
+
+    # Resume: skip tools a previous, interrupted run already resolved to a domain
+    done = set()
+    if os.path.isfile(OUTPUT_CSV):
+        done = drop_unresolved_rows(OUTPUT_CSV)
+    records = [r for r in df.to_dict("records") if r["Tool Page URL"] not in done]
+    print(f"{len(done)} tools already crawled, {len(records)} to go")
+
+    with open(OUTPUT_CSV, "a", newline="", encoding="utf-8") as out:
+        writer = csv.DictWriter(out, fieldnames=fieldnames)
+        if out.tell() == 0:
+            writer.writeheader()
+
+        # Selenium is not thread-safe, so fan the rows out over worker processes instead
+        with Pool(processes=WORKERS, initializer=register_driver_cleanup) as pool:
+            failed = 0
+            for row in pool.imap_unordered(work, records, chunksize=16):
+                # Failed rows are left out so the next run retries them
+                if not row["Domain"]:
+                    failed += 1
+                    continue
+                # Write each row as soon as it is done so a crash loses nothing
+                writer.writerow(row)
+                out.flush()
+            # Let workers exit normally so their drivers are quit
+            pool.close()
+            pool.join()
+        print(f"{failed} tools failed and will be retried on the next run")
 
 
 if __name__ == "__main__":
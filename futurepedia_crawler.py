@@ -1,119 +1,120 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+import asyncio
+import lxml.html
+import re
 import csv
 import os
+from urllib.parse import urljoin
+from http_session import make_session, fetch, parse_page, fetch_more_pages
 
 BASE_URL = "https://www.futurepedia.io"
+PAGE_SIZE = 12
+PAGE_RE = re.compile(r"[?&]page=(\d+)")
 
-def get_all_category_links(driver, url):
-    driver.get(url)
-    WebDriverWait(driver, 10).until(
-        EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a.text-ice-500[href^='ai-tools/']"))
-    )
-    anchors = driver.find_elements(By.CSS_SELECTOR, "a.text-ice-500[href^='ai-tools/']")
+
+async def get_all_category_links(session, url):
+    html = await fetch(session, url)
+    if not html:
+        return []
+    # Category anchors are matched on their relative href, so resolve them one by one
+    tree = lxml.html.fromstring(html)
     category_links = []
     seen_urls = set()
 
-    for anchor in anchors:
-        href = anchor.get_attribute("href")
-        if href:
-            full_url = href.strip("/")
-            if full_url not in seen_urls:
-                name = anchor.text.strip()
-                category_links.append((name, full_url))
-                seen_urls.add(full_url)
+    for anchor in tree.cssselect("a.text-ice-500[href^='ai-tools/']"):
+        full_url = urljoin(url, anchor.get("href")).strip("/")
+        if full_url not in seen_urls:
+            name = anchor.text_content().strip()
+            category_links.append((name, full_url))
+            seen_urls.add(full_url)
 
     return category_links
 
 
-def get_all_subcategory_links(driver, category_links):
+async def get_all_subcategory_links(session, category_links):
     subcategories = []
     seen_sub_urls = set()
 
-    for category_url in category_links:
-        driver.get(category_url[1])
-        try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a.text-ice-500[href]"))
-            )
-            anchors = driver.find_elements(By.CSS_SELECTOR, "a.text-ice-500[href]")
-            for anchor in anchors:
-                href = anchor.get_attribute("href")
-                if href and href.startswith("https://www.futurepedia.io/ai-tools/"):
-                    if href not in seen_sub_urls:
-                        name = anchor.text.strip()
-                        subcategories.append((name, href, category_url[0], category_url[1]))
-                        seen_sub_urls.add(href)
-        except Exception as e:
-            print(f"Error loading subcategories for {category_url}: {e}")
+    pages = await asyncio.gather(
+        *(fetch(session, category_url[1]) for category_url in category_links),
+        return_exceptions=True,
+    )
+    for category_url, html in zip(category_links, pages):
+        if isinstance(html, Exception) or not html:
+            print(f"Error loading subcategories for {category_url}: {html}")
             continue
 
-    return subcategories
+        tree = parse_page(html, category_url[1])
+        for anchor in tree.cssselect("a.text-ice-500[href]"):
+            href = anchor.get("href")
+            if href and href.startswith("https://www.futurepedia.io/ai-tools/"):
+                if href not in seen_sub_urls:
+                    name = anchor.text_content().strip()
+                    subcategories.append((name, href, category_url[0], category_url[1]))
+                    seen_sub_urls.add(href)
 
+    return subcategories
 
 
-def get_internal_tool_links_from_subcategory(driver, subcat):
+def get_tools_from_page(tree, subcat):
     tools = []
-    page = 1
-
-    while True:
-        url = f"{subcat[1]}?page={page}" if page > 1 else subcat[1]
-        print(f"Visiting: {url}")
-        driver.get(url)
-
-        try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a[href^='https://www.futurepedia.io/tool/']"))
-            )
-        except:
-            print(f"No internal tools found on page {page} of {subcat[1]}.")
-            break
-
+    seen_tools = set()
+    anchors = tree.cssselect("a[href^='https://www.futurepedia.io/tool/']")
+    for anchor in anchors:
+        href = anchor.get("href")
+        if href and href not in seen_tools:
+            name = anchor.text_content().strip()
+            tools.append((name, href, subcat[2], subcat[3], subcat[0], subcat[1]))
+            seen_tools.add(href)
+    return tools, len(anchors)
+
+
+async def get_internal_tool_links_from_subcategory(session, subcat):
+    print(f"Visiting: {subcat[1]}")
+    html = await fetch(session, subcat[1])
+    if not html:
+        print(f"No internal tools found on page 1 of {subcat[1]}.")
+        return []
+
+    tree = parse_page(html, subcat[1])
+    tools, anchor_count = get_tools_from_page(tree, subcat)
+    if anchor_count < PAGE_SIZE:
+        return tools
+
+    tools += await fetch_more_pages(
+        session, tree, subcat[1], lambda page: f"{subcat[1]}?page={page}",
+        PAGE_RE, PAGE_SIZE, lambda page_tree: get_tools_from_page(page_tree, subcat),
+    )
+    return tools
 
-        anchors = driver.find_elements(By.CSS_SELECTOR, "a[href^='https://www.futurepedia.io/tool/']")
-        if not anchors:
-            break
 
-        seen_tools = set()
-        for anchor in anchors:
-            href = anchor.get_attribute("href")
-            if href and href not in seen_tools:
-                name = anchor.text.strip()
-                tools.append((name, href, subcat[2], subcat[3], subcat[0], subcat[1]))
-                seen_tools.add(href)
+def tool_rows(subcategories, results):
+    for subcat, tools in zip(subcategories, results):
+        if isinstance(tools, Exception):
+            print(f"Error scraping {subcat[1]}: {tools}")
+            continue
+        yield from tools
 
 
-        if len(anchors) < 12:
-            break
+async def main():
+    main_url = 'https://www.futurepedia.io/ai-tools'
+    file_path = "futurepedia_tools_UPDATED.csv"
+    file_exists = os.path.isfile(file_path)
 
-        page += 1
+    async with make_session() as session:
+        categories = await get_all_category_links(session, main_url)
+        subcategories = await get_all_subcategory_links(session, categories)
+        results = await asyncio.gather(
+            *(get_internal_tool_links_from_subcategory(session, subcat) for subcat in subcategories),
+            return_exceptions=True,
+        )
 
-    return tools
+    with open(file_path, "a", newline="", encoding="utf-8", buffering=1024 * 1024) as f:
+        writer = csv.writer(f)
+        if not file_exists:
+            writer.writerow(["Tool Page Title", "Tool Page URL", "Category", "Category URL", "Subcategory", "Source Subcategory URL"])
 
+        writer.writerows(tool_rows(subcategories, results))
 
 
 if __name__ == "__main__":
-    main_url = 'https://www.futurepedia.io/ai-tools'
-    file_path = "futurepedia_tools_UPDATED.csv"
-    file_exists = os.path.isfile(file_path)
-
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-    try:
-        with open(file_path, "a", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            if not file_exists:
-                writer.writerow(["Tool Page Title", "Tool Page URL", "Category", "Category URL", "Subcategory", "Source Subcategory URL"])
-
-            categories = get_all_category_links(driver, main_url)
-            subcategories = get_all_subcategory_links(driver, categories)
-            for subcat in subcategories:
-                tools = get_internal_tool_links_from_subcategory(driver, subcat)
-                for tool in tools:
-                    writer.writerow(tool)
-
-    finally:
-        driver.quit()
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+import aiohttp
+import asyncio
+import lxml.html
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko)"
+    " Chrome/124.0.0.0 Safari/537.36"
+}
+
+# Caps the number of requests in flight across a whole crawl
+semaphore = asyncio.BoundedSemaphore(20)
+# Stops fetch_more_pages if a site serves a full page for any page number
+MAX_PAGES = 1000
+
+
+def make_session():
+    return aiohttp.ClientSession(
+        headers=HEADERS,
+        timeout=aiohttp.ClientTimeout(total=30),
+        connector=aiohttp.TCPConnector(limit=64, limit_per_host=8),
+    )
+
+
+async def fetch(session, url):
+    # A failed page comes back as None, like a non-200 one, so it never takes
+    # the pages already fetched alongside it down with it
+    async with semaphore:
+        try:
+            async with session.get(url) as resp:
+                if resp.status != 200:
+                    print(f"Got HTTP {resp.status} for {url}")
+                    return None
+                return await resp.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error fetching {url}: {e!r}")
+            return None
+
+
+def parse_page(html, url):
+    tree = lxml.html.fromstring(html, base_url=url)
+    tree.make_links_absolute()
+    return tree
+
+
+def get_last_page(tree, base_url, page_re):
+    # Highest page number the pagination bar links to. Only links under base_url
+    # count; sidebars and footers can point at other paged listings.
+    base = base_url.rstrip("/")
+    pages = [1]
+    for anchor in tree.cssselect("a[href]"):
+        href = anchor.get("href")
+        rest = href[len(base):]
+        if href.startswith(base) and rest[:1] in ("/", "?"):
+            match = page_re.search(rest)
+            if match:
+                pages.append(int(match.group(1)))
+    return max(pages)
+
+
+async def fetch_more_pages(session, tree, base_url, page_url, page_re, page_size, parse):
+    # Items from page 2 onward of a listing whose first page is tree. page_url(n)
+    # builds the URL of page n and parse(tree) returns (items, card_count). A
+    # windowed pagination bar can undercount, so once the pages it names are
+    # fetched, keep going one page at a time while the last one is full.
+    items = []
+    first, last = 2, max(2, get_last_page(tree, base_url, page_re))
+    while True:
+        urls = [page_url(page) for page in range(first, last + 1)]
+        pages = await asyncio.gather(*(fetch(session, url) for url in urls))
+        full = False
+        for url, html in zip(urls, pages):
+            if not html:
+                print(f"Nothing found on {url}.")
+                full = False
+                continue
+            page_items, card_count = parse(parse_page(html, url))
+            items.extend(page_items)
+            full = card_count >= page_size
+        if not full or last >= MAX_PAGES:
+            return items
+        first = last = last + 1
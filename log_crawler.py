@@ -1,15 +1,48 @@
 import os
 import re
 import json
+import mmap
+import logging
 import argparse
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import hyperscan  # optional; preferred over both fallbacks below when installed
+except ImportError:
+    hyperscan = None
+
+try:
+    import orjson  # optional; serializes the summary in C, falls back to the json module
+except ImportError:
+    orjson = None
+
+try:
+    import ahocorasick  # pyahocorasick; optional, the regex alternation is used without it
+except ImportError:
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+
+# Set in each pool worker by init_worker
+_MATCHER = None
+_SPLIT = 0
+
+# Files at least this large are memory-mapped and scanned in chunks; smaller ones are read in one call
+MMAP_MIN_SIZE = 100 * 1024 * 1024
+CHUNK_SIZE = 16 * 1024 * 1024
+
+# 256-entry table: WORD_BYTES[b] is 1 for the bytes a bytes-regex \b treats as word characters
+WORD_BYTES = bytes(
+    c in b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_" for c in range(256)
+)
 
 def load_list(file_path):
     """
     Read a “dictionary” file (domains.txt or functions.txt), one entry per line.
     - Strips whitespace.
     - Ignores blank/comment lines (lines beginning with '#').
-    - Returns a list of escaped strings to be used in a regex literal match.
+    - Returns the entries as written in the file.
     """
     entries = []
     with open(file_path, 'r', encoding='utf-8') as f:
@@ -17,96 +50,282 @@ def load_list(file_path):
             line = raw.strip()
             if not line or line.startswith('#'):
                 continue
-            # Escape special chars so, e.g., "completions.create" → "completions\.create"
-            entries.append(re.escape(line))
+            entries.append(line)
     return entries
 
-def compile_pattern(escaped_list):
+def compile_pattern(entries):
+    """
+    Given a list of raw entries, build one combined *bytes* regex over their lowercased forms:
+      rb"(item1|item2|item3)\b"
+    Together with the left‐hand boundary check in scan_with_pattern, that will match ANY of
+    the items as a “whole word,” so we don't accidentally pick up substrings of longer tokens.
+    Longer items come first in the alternation, so where several items start at the same
+    offset the longest one wins, whatever order the list file has them in.
+    The leading \b is left out of the regex on purpose: with the alternation first, re can
+    skip ahead to bytes that start some entry instead of trying every offset in the file.
+    It is meant to run on text that was lowercased up front, which is cheaper than
+    re.IGNORECASE folding every comparison.
+    Returns (pattern, canonical) where canonical maps a matched lowercase token back to
+    the index of the entry in the list.
+    """
+    if not entries:
+        return None
+    canonical = {e.encode('utf-8').lower(): i for i, e in enumerate(entries)}
+    # Escape special chars so, e.g., "completions.create" → "completions\.create"
+    alternation = b"|".join(re.escape(key) for key in sorted(canonical, key=len, reverse=True))
+    pattern = re.compile(rb"(" + alternation + rb")\b")
+    return pattern, canonical
+
+def build_automaton(entries):
+    """
+    Build an Aho–Corasick automaton over the raw entries. It finds every entry in one
+    linear pass over the text, however many entries there are. Keys are the lowercased
+    UTF‐8 bytes of each entry spelled as latin‐1 text, so key lengths are byte lengths
+    and match offsets line up with the raw log buffer. Values are (key length, entry index).
+    """
+    if not entries:
+        return None
+    automaton = ahocorasick.Automaton()
+    for i, e in enumerate(entries):
+        key = e.encode('utf-8').lower().decode('latin-1')
+        automaton.add_word(key, (len(key), i))
+    automaton.make_automaton()
+    return automaton
+
+def build_database(entries):
     """
-    Given a list of already re.escape()’d strings, build one combined regex:
-      r"\b(item1|item2|item3)\b"
-    That will match ANY of the items as a “whole word.” Using \b ensures we don't
-    accidentally pick up substrings of longer tokens. Case‐insensitive by default.
+    Compile the entries into one Hyperscan block‐mode database: a SIMD multi‐literal
+    automaton that scans a buffer once for all entries. Each entry becomes its own
+    lowercased r"\bentry\b" expression whose id is its index in the entry list.
+    HS_FLAG_SOM_LEFTMOST makes Hyperscan report where each hit starts, which
+    add_leftmost_longest needs to drop overlapping hits the regex would not report.
     """
-    if not escaped_list:
+    if not entries:
         return None
-    alternation = "|".join(escaped_list)
-    pattern = rf"\b({alternation})\b"
-    return re.compile(pattern, flags=re.IGNORECASE)
+    # Entries that only differ in case share one expression, keeping the last index as the regex does
+    keys = {e.encode('utf-8').lower(): i for i, e in enumerate(entries)}
+    database = hyperscan.Database()
+    database.compile(
+        expressions=[rb"\b" + re.escape(key) + rb"\b" for key in keys],
+        ids=list(keys.values()),
+        elements=len(keys),
+        flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(keys),
+    )
+    return database
+
+def at_word_boundary(buf, pos):
+    """
+    True where \b would match between buf[pos-1] and buf[pos].
+    """
+    before = WORD_BYTES[buf[pos - 1]] if pos > 0 else 0
+    after = WORD_BYTES[buf[pos]] if pos < len(buf) else 0
+    return before != after
+
+def add_leftmost_longest(hits, found):
+    """
+    Given whole‐word hits as (start, end, entry index), add to found the entries the
+    regex would report: left to right, the longest hit at each offset, skipping any hit
+    that starts inside one already taken. Automaton and Hyperscan report every
+    overlapping hit, so without this "client.messages" would also be reported for each
+    "client.messages.create".
+    """
+    taken_end = 0
+    for start, end, index in sorted(hits, key=lambda hit: (hit[0], -hit[1])):
+        if start >= taken_end:
+            found.add(index)
+            taken_end = end
+
+def scan_with_pattern(compiled, buf, found):
+    """
+    Add the index of every entry matched by a compile_pattern() regex in the lowercased
+    buf to found.
+    A hit that fails the left \b check is retried one byte further on, which is where
+    the \b(...)\b regex would have resumed.
+    """
+    pattern, canonical = compiled
+    search = pattern.search
+    m = search(buf)
+    while m:
+        start = m.start()
+        if at_word_boundary(buf, start):
+            found.add(canonical[m.group(1)])
+            m = search(buf, m.end())
+        else:
+            m = search(buf, start + 1)
+
+def scan_with_automaton(automaton, buf, found):
+    """
+    Add the index of every entry of a build_automaton() automaton found in the lowercased
+    buf as a whole word to found, using the same \b and overlap rules as the regex.
+    """
+    text = buf.decode('latin-1')
+    hits = []
+    for last, (length, index) in automaton.iter(text):
+        start, end = last - length + 1, last + 1
+        if at_word_boundary(buf, start) and at_word_boundary(buf, end):
+            hits.append((start, end, index))
+    add_leftmost_longest(hits, found)
+
+def scan_with_database(database, buf, found):
+    """
+    Add the index of every entry of a build_database() database found in the lowercased
+    buf to found, using the same overlap rule as the regex.
+    """
+    hits = []
+
+    def on_match(entry_id, start, end, flags, context):
+        hits.append((start, end, entry_id))
+
+    database.scan(buf, match_event_handler=on_match)
+    add_leftmost_longest(hits, found)
 
-def scan_log_file(path, domain_pattern, function_pattern, domains_found, functions_found):
+def run_matcher(matcher, buf, found):
     """
-    Open one .log file in streaming mode. For each line:
-      - run domain_pattern.finditer(...) → add each match.group(1) to domains_found
-      - run function_pattern.finditer(...) → add each match.group(1) to functions_found
+    Scan the lowercased buf with whichever kind of matcher build_matcher() produced.
+    """
+    if hyperscan and isinstance(matcher, hyperscan.Database):
+        scan_with_database(matcher, buf, found)
+    elif isinstance(matcher, tuple):
+        scan_with_pattern(matcher, buf, found)
+    else:
+        scan_with_automaton(matcher, buf, found)
+
+def scan_log_file(path, size, matcher, found):
+    """
+    Read one .log file of the given size, lowercase its bytes, and scan them in a single pass:
+      - run matcher (Hyperscan, automaton or regex) over domains and functions together
+        → add each matched entry's index to found
+    Small files are read with a single read() call. Large ones are memory-mapped and
+    scanned in CHUNK_SIZE windows, so only one window is ever copied and lowercased.
+    Windows are cut just after a newline, which no list entry can contain, and each one
+    starts on the previous window's last newline so \b still sees the byte on either side.
+    No line splitting or UTF‐8 decoding happens.
     """
     try:
-        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-            for raw_line in f:
-                if domain_pattern:
-                    for dm in domain_pattern.finditer(raw_line):
-                        domains_found.add(dm.group(1))
-                if function_pattern:
-                    for fm in function_pattern.finditer(raw_line):
-                        functions_found.add(fm.group(1))
-    except Exception as e:
-        # Skip files we can’t open/read for any reason
-        print(f"  [WARNING] Could not read {path!r}: {e}")
+        with open(path, 'rb') as f:
+            if size < MMAP_MIN_SIZE:
+                # Entries are matched in lowercase, so fold the whole buffer in one C call
+                run_matcher(matcher, f.read().lower(), found)
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    # The file is read front to back exactly once; let the kernel read ahead aggressively
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                size = len(mm)
+                start = 0
+                while start < size:
+                    end = min(start + CHUNK_SIZE, size)
+                    if end < size:
+                        cut = mm.rfind(b"\n", start + 1, end)
+                        if cut == -1:
+                            cut = mm.find(b"\n", end)  # one line longer than a window
+                        end = size if cut == -1 else cut + 1
+                    run_matcher(matcher, mm[start:end].lower(), found)
+                    start = end - 1 if end < size else size
+    except OSError as e:
+        # Skip files we can’t open/read
+        logger.warning("Could not read %r: %s", path, e)
 
 def find_log_files(root_dir, extensions=('.log',)):
     """
     Walk only one level down (non‐recursive within each site‐folder) to find *.log files.
+    os.scandir hands back the file type from the directory listing, so no stat per entry;
+    symlinks are not followed, since resolving them would cost a stat each.
+    Yields (path, size) and leaves out empty files, which have nothing to scan.
     """
-    for entry in os.listdir(root_dir):
-        full = os.path.join(root_dir, entry)
-        if os.path.isfile(full) and entry.lower().endswith(extensions):
-            yield full
+    with os.scandir(root_dir) as it:
+        for entry in it:
+            if entry.name.lower().endswith(extensions) and entry.is_file(follow_symlinks=False):
+                size = entry.stat(follow_symlinks=False).st_size
+                if size:
+                    yield entry.path, size
 
-def main(domains_txt, functions_txt, root_folder, output_json):
+def build_matcher(entries):
+    """
+    Compile one matcher over every entry. Called once inside each worker process,
+    since compiled regexes and automatons are not worth pickling across the pool.
+    """
+    if not entries:
+        return None
+    if hyperscan:
+        return build_database(entries)
+    # The entries are plain literals, so match them all with one Aho–Corasick automaton when available
+    return build_automaton(entries) if ahocorasick else compile_pattern(entries)
+
+def dump_json(obj):
+    """
+    Serialize obj as UTF‐8 JSON bytes indented by two spaces, with orjson when installed.
+    """
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+def init_worker(domains_list, functions_list):
+    """
+    Pool initializer: compile the shared matcher once per worker process and keep it in
+    module globals, so tasks only carry a site name and path.
+    Domains and functions share one matcher, so each file is scanned once for both;
+    function indices come after the domain ones and are shifted back in scan_site.
+    """
+    global _MATCHER, _SPLIT
+    _MATCHER = build_matcher(domains_list + functions_list)
+    _SPLIT = len(domains_list)
+
+def scan_site(site_name, site_dir):
+    """
+    Scan all .log files directly inside one site folder with the matcher set up by
+    init_worker.
+    Returns (site_name, matched_domains, matched_functions), the latter two as sets of
+    indices into domains_list and functions_list.
+    """
+    found = set()
+
+    if _MATCHER:
+        for log_file, size in find_log_files(site_dir, extensions=('.log',)):
+            scan_log_file(path=log_file, size=size, matcher=_MATCHER, found=found)
+
+    matched_domains = {i for i in found if i < _SPLIT}
+    matched_functions = {i - _SPLIT for i in found if i >= _SPLIT}
+    return site_name, matched_domains, matched_functions
+
+def main(domains_txt, functions_txt, root_folder, output_json, workers=None):
     # 1) Load & compile both patterns
     domains_list = load_list(domains_txt)
     functions_list = load_list(functions_txt)
 
-    domain_pattern = compile_pattern(domains_list) if domains_list else None
-    function_pattern = compile_pattern(functions_list) if functions_list else None
-
-    if (domains_list and not domain_pattern) or (functions_list and not function_pattern):
+    if (domains_list or functions_list) and not build_matcher(domains_list + functions_list):
         print("Error: failed to compile one of the regex patterns. Exiting.")
         return
 
-    results = {}  # final: {site_name: {"domains": [...], "functions": [...]}, ...}
-
     # 2) For each subfolder under root_folder (each is treated as a “site”)
-    for entry in os.listdir(root_folder):
-        site_dir = os.path.join(root_folder, entry)
-        if not os.path.isdir(site_dir):
-            continue  # skip anything that isn’t a folder at this level
-
-        site_name = entry
-        matched_domains = set()
-        matched_functions = set()
-
-        # 3) Scan all .log files directly inside this subfolder
-        for log_file in find_log_files(site_dir, extensions=('.log',)):
-            scan_log_file(
-                path=log_file,
-                domain_pattern=domain_pattern,
-                function_pattern=function_pattern,
-                domains_found=matched_domains,
-                functions_found=matched_functions
-            )
-
-        # 4) If either domains or functions was found, add to results
-        #    Even if one list is empty, we still emit the other as an empty list
-        if matched_domains or matched_functions:
-            results[site_name] = {
-                "domains":  sorted(matched_domains),
-                "functions": sorted(matched_functions)
-            }
+    with os.scandir(root_folder) as it:
+        site_entries = [entry for entry in it if entry.is_dir(follow_symlinks=False)]  # skip anything that isn’t a folder
 
-    # 5) Write out JSON
-    with open(output_json, 'w', encoding='utf-8') as out_f:
-        json.dump(results, out_f, indent=2)
+    # 3) Sites are independent, so scan them in parallel across all cores and
+    #    stream each one into the JSON file as soon as its worker finishes
+    with ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(),
+            initializer=init_worker,
+            initargs=(domains_list, functions_list)
+    ) as executor, open(output_json, 'wb') as out_f:
+        futures = [executor.submit(scan_site, entry.name, entry.path) for entry in site_entries]
+        out_f.write(b"{")
+        written = 0
+        for future in as_completed(futures):
+            site_name, matched_domains, matched_functions = future.result()
+            # 4) If either domains or functions was found, write the site out
+            #    Even if one list is empty, we still emit the other as an empty list
+            if not (matched_domains or matched_functions):
+                continue
+            summary = {
+                "domains":  sorted({domains_list[i] for i in matched_domains}),
+                "functions": sorted({functions_list[i] for i in matched_functions})
+            }
+            # Same layout json.dump(indent=2) produced for the whole dict
+            out_f.write(b",\n  " if written else b"\n  ")
+            out_f.write(dump_json(site_name) + b": " + dump_json(summary).replace(b"\n", b"\n  "))
+            written += 1
+        out_f.write(b"\n}" if written else b"}")
 
     print(f"\nDone. Wrote summary to {output_json!r}.")
 
@@ -132,6 +351,13 @@ if __name__ == "__main__":
         default="site_domain_usage.json",
         help="Path for the JSON output (default: site_domain_usage.json)."
     )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=None,
+        help="Number of worker processes scanning sites in parallel (default: one per CPU)."
+    )
     args = parser.parse_args()
+    logging.basicConfig(format="  [%(levelname)s] %(message)s")
 
-    main(args.domains_txt, args.functions_txt, args.root_folder, args.output)
+    main(args.domains_txt, args.functions_txt, args.root_folder, args.output, args.workers)
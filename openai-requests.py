@@ -37,19 +37,10 @@ class EndpointsResponse(TypedDict):
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def process_site(name, domain):
-
+MAX_WORKERS = 16  # concurrent API requests; lower this if the account hits rate limits
 
-    user_prompt = (
-        f"""
-        find me all the API links available for this tool/service. Title: {name} Domain: {domain}
-        """
-    )
-
-    # Make the API request; adjust temperature and max_tokens as needed.
-
-        # system_prompt = "Output can be either an appropriate  URL or NA"
-    system_prompt = """
+# Built once at import time rather than on every request
+SYSTEM_PROMPT = """
 You are an expert at finding API URLs/endpoints and function calls exposed by AI tools, platforms, or services that developers can use to integrate into their websites or apps.
 
 Your task is to extract two types of integration interfaces:
@@ -160,11 +151,23 @@ Return **only** valid JSON in this format:
 }
 """
 
+
+def process_site(name, domain):
+
+
+    user_prompt = (
+        f"""
+        find me all the API links available for this tool/service. Title: {name} Domain: {domain}
+        """
+    )
+
+    # Make the API request; adjust temperature and max_tokens as needed.
+
     
     # response = client.chat.completions.create(
     #     model="o3-mini-2025-01-31", # "gpt-3.5-turbo"
     #     messages=[
-    #         {"role": "system", "content": system_prompt},
+    #         {"role": "system", "content": SYSTEM_PROMPT},
     #         {"role": "user", "content": user_prompt}
     #     ],
     #     # temperature=0.7, # remove temperature for o3 mini
@@ -175,7 +178,7 @@ Return **only** valid JSON in this format:
     resp: ParsedChatCompletion[Response] = client.beta.chat.completions.parse(
             model="gpt-4o-mini-2024-07-18", # "gpt-3.5-turbo" "o3-mini"
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ],
             temperature=0,
@@ -204,18 +207,26 @@ def main():
     filename = 'AIinWeb.csv'
     file_exists = os.path.exists(filename)
     fieldnames = ['Service Name', 'Domain', 'API URL', 'Function Calls']
-    with open(filename, mode='a', newline='') as file:
+    with open(filename, mode='a', newline='', buffering=1024 * 1024) as file:
         writer = csv.DictWriter(file, fieldnames=fieldnames, quotechar='"', quoting=csv.QUOTE_MINIMAL)
         if not file_exists:
             writer.writeheader()
-        for name, domain in tools:
-            endpoints, patterns, functions = process_site(name, domain)
-            writer.writerow({
-                'Service Name': name,
-                'Domain': ' '.join(patterns),
-                'API URL': ' '.join(endpoints),
-                'Function Calls': ' '.join(functions)
-            })
+        # Each request is one HTTP round-trip, so run them concurrently and write rows as they finish
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = {executor.submit(process_site, name, domain): name for name, domain in tools}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    endpoints, patterns, functions = future.result()
+                except Exception as e:
+                    print(f"Error processing {name}: {e}")
+                    continue
+                writer.writerow({
+                    'Service Name': name,
+                    'Domain': ' '.join(patterns),
+                    'API URL': ' '.join(endpoints),
+                    'Function Calls': ' '.join(functions)
+                })
 
         
 
@@ -59,23 +59,26 @@ async def main(website=None):
         website = sys.argv[1]
     
     i = 1
-    while i < 21:
-        # /page/{i}
-    # For each AI tool, visit http://localhost:9000/<Service_url>. IGNORE Enso Bot
-        agent = Agent(
-            task=f"Visit 'https://www.aixploria.com/en/last-ai/page/{i}' and get the URLs from the 12 AI tools listed on the page from their title button at the top of each tool square. IGNORE the enso bot and any URLs that are NOT AI tools. Collect the URLs for all 12 tools FIRST, then put the 12 urls into a comma separated string, and then encode it as a base 64 string. Visit http://localhost:9000/update?service_url=<Service_URL>, and input the base64-encoded string THAT YOU CREATED into 'Service_URL'.",
-            llm=ChatOpenAI(model="gpt-4o"),
-            browser=browser,  # Browser instance will be reused
-            context=context,
-            save_conversation_path="./logs/conversation",
-            extend_system_message=extend_system_message
-        )
+    try:
+        while i < 21:
+            # /page/{i}
+        # For each AI tool, visit http://localhost:9000/<Service_url>. IGNORE Enso Bot
+            agent = Agent(
+                task=f"Visit 'https://www.aixploria.com/en/last-ai/page/{i}' and get the URLs from the 12 AI tools listed on the page from their title button at the top of each tool square. IGNORE the enso bot and any URLs that are NOT AI tools. Collect the URLs for all 12 tools FIRST, then put the 12 urls into a comma separated string, and then encode it as a base 64 string. Visit http://localhost:9000/update?service_url=<Service_URL>, and input the base64-encoded string THAT YOU CREATED into 'Service_URL'.",
+                llm=ChatOpenAI(model="gpt-4o"),
+                browser=browser,  # Browser instance will be reused
+                context=context,
+                save_conversation_path="./logs/conversation",
+                extend_system_message=extend_system_message
+            )
 
-        await agent.run()
-
-        # Manually close the browser
+            await agent.run()
+            i += 1
+    finally:
+        # Manually close the browser once every page is done, or as soon as one fails; the agents
+        # above share it, so relaunching Chromium per page would only add startup time
+        await context.close()
         await browser.close()
-        i += 1
 
 if __name__ == "__main__":
     website = sys.argv[1] if len(sys.argv) > 1 else None
@@ -1,15 +1,32 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+from chrome_driver import build_driver
+import lxml.html
 import csv
 import os
 
+CARD_SELECTOR = "article.landing__listing-card"
+
+
+# Returns (tool_name, tool_url) for every listing card in a parsed page or fragment
+def get_tools_from_page(tree):
+    tools = []
+    for article in tree.cssselect(CARD_SELECTOR):
+        # Get the anchor with tool name and link inside the <h4>
+        title_anchors = article.cssselect("h4.landing__listing-title a")
+        if not title_anchors or not title_anchors[0].get("href"):
+            print("Skipping one article without a title link")
+            continue
+        tool_name = title_anchors[0].text_content().strip()
+        tool_url = title_anchors[0].get("href").strip()
+        tools.append((tool_name, tool_url))
+    return tools
+
+
 def scrape_saasai_tools(home_url="https://saasaitools.com/"):
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
+    driver = build_driver()
     wait = WebDriverWait(driver, 10)
     try:
         driver.get(home_url)
@@ -17,26 +34,28 @@ def scrape_saasai_tools(home_url="https://saasaitools.com/"):
         while True:
             try:
                 load_more = wait.until(EC.element_to_be_clickable((By.CLASS_NAME, "wpgb-load-more")))
+                shown = len(driver.find_elements(By.CSS_SELECTOR, CARD_SELECTOR))
                 print("Clicking Load More...")
                 driver.execute_script("arguments[0].click();", load_more)
-                time.sleep(2)
-            except:
+                # Move on as soon as the next batch of cards is in the DOM instead of sleeping
+                wait.until(lambda d: len(d.find_elements(By.CSS_SELECTOR, CARD_SELECTOR)) > shown)
+            except StaleElementReferenceException:
+                # The grid re-rendered under the button; look it up again
+                print("'Load More' button went stale, retrying")
+                continue
+            except TimeoutException:
                 print("No more 'Load More' button or timeout")
                 break
+            except WebDriverException as e:
+                # Keep the cards loaded so far instead of throwing them all away
+                print(f"Stopped loading more tools: {e}")
+                break
 
-        # Get all tool article blocks
-        articles = driver.find_elements(By.CSS_SELECTOR, "article.landing__listing-card")
-        tools = []
-
-        for article in articles:
-            try:
-                # Get the anchor with tool name and link inside the <h4>
-                title_anchor = article.find_element(By.CSS_SELECTOR, "h4.landing__listing-title a")
-                tool_name = title_anchor.text.strip()
-                tool_url = title_anchor.get_attribute("href").strip()
-                tools.append((tool_name, tool_url))
-            except Exception as e:
-                print(f"Skipping one article due to error: {e}")
+        # Pull the rendered page once and query the tool blocks locally instead of
+        # making a chromedriver round trip per article and attribute
+        tree = lxml.html.fromstring(driver.page_source, base_url=driver.current_url)
+        tree.make_links_absolute()
+        tools = get_tools_from_page(tree)
 
         print(f"Collected {len(tools)} tools")
         return tools
@@ -1,7 +1,12 @@
 import pandas as pd
-import ast
+
+# Rows hold the repr of a (name, url) tuple; repr quotes with " when the name contains a '
+TUPLE_RE = r"""^\((['"])(?P<name>.*)\1, (['"])(?P<url>.*)\3\)$"""
 
 df = pd.read_csv("tool_datasets/saasai_ai_tools_UPDATED.csv")
-df[["Tool_Name", "Tool Page URL"]] = df["Source URL"].apply(lambda x: pd.Series(ast.literal_eval(x)))
-df.drop("Source URL", axis=1)
+# One vectorized regex pass instead of ast.literal_eval per row
+parts = df["Source URL"].str.extract(TUPLE_RE)
+df["Tool_Name"] = parts["name"]
+df["Tool Page URL"] = parts["url"]
+df = df.drop("Source URL", axis=1)
 df.to_csv("tool_datasets/saasai_ai_tools_FINAL.csv")
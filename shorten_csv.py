@@ -17,12 +17,21 @@ def normalize_url(raw: str, force_www: bool = False) -> str:
 
     return raw
 
+def normalize_urls(urls: pd.Series, force_www: bool = False) -> pd.Series:
+    # Same rules as normalize_url, applied to the whole column with pandas string methods
+    urls = urls.str.strip()
+
+    if force_www:
+        urls = urls.mask(~urls.str.lower().str.startswith("www.", na=False), "www." + urls)
+
+    return urls.mask(~urls.str.contains("://", regex=False, na=False), "https://" + urls)
+
 def is_valid_url(u: str) -> bool:
     parts = urlparse(u)
     # must have a scheme (http/https) and a netloc (hostname)
     return bool(parts.scheme) and bool(parts.netloc)
 
-df["url"] = df["url"].apply(lambda u: normalize_url(u, force_www=False))
+df["url"] = normalize_urls(df["url"], force_www=False)
 
 
 df.to_csv("urls_with_subdomains_forCrawl.csv", index=False)
\ No newline at end of file
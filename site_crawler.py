@@ -1,15 +1,62 @@
-import csv, json, time, random
+import csv, json, logging, os, time, random
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener
+from multiprocessing import Pool, Queue
 from pathlib import Path
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
+from urllib.parse import urlparse
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import InvalidSessionIdException, TimeoutException
+from chrome_driver import (MEDIA_URLS, start_chrome, get_driver, reset_driver,
+                           register_driver_cleanup, wait_for_slot)
+
+try:
+    import orjson  # optional; parses the perf log and serializes the dumps in C, falls back to the json module
+except ImportError:
+    orjson = None
+
+load_json = orjson.loads if orjson else json.loads
+
+try:
+    import zstandard  # optional; compresses requests/responses dumps to .json.zst
+except ImportError:
+    zstandard = None
+
+try:
+    import tldextract  # optional; groups URLs by registered domain using the public suffix list
+except ImportError:
+    tldextract = None
 
 # ─── Configuration ─────────────────────────────────────────────
 INPUT_CSV   = "test_URLs.csv"
+LOG_FILE    = "site_crawl.log"
 OUT_DIR     = Path("logs_selenium_stealth")
 OUT_DIR.mkdir(exist_ok=True)
 MAX_SCROLLS = 100                      # max scroll iterations
+SCROLL_WAIT = 0.5                      # max seconds to wait for lazy content after each scroll
+NETWORK_QUIET = 2.0                    # seconds without a new request that count as idle
+DWELL_MAX   = 10.0                     # max seconds to wait for ads/iframes after scrolling
+HEADER_CAP  = 2048                     # longer header values are replaced by a length marker
+KEEP_HEADERS = {"content-type", "cache-control", "location"}  # never truncated
+ZSTD_LEVEL  = 3                        # zstd level for the network dumps when zstandard is installed
+BLOCK_MEDIA = True                     # skip image/font/media downloads; set False when auditing them
+WORKERS     = os.cpu_count()           # sites crawled at once, one Chrome per worker process
+DOMAIN_RATE = 2.0                      # page loads per second to any one domain
+
+logger = logging.getLogger("site_crawler")
+
+# Chrome flags shared by every worker's browser
+CHROME_ARGS = [
+    # nothing is ever looked at on screen, so skip painting to a real window
+    "--headless=new",
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-blink-features=AutomationControlled",
+    "--no-sandbox",
+    "--disable-infobars",
+    "--incognito",
+]
 
 # rotate through realistic desktop user-agents
 USER_AGENTS = [
@@ -34,23 +81,54 @@ WebGLRenderingContext.prototype.getParameter = function(p) {
 };
 """
 
+# [viewport bottom, total page height]
+MEASURE_JS = "return [window.pageYOffset + window.innerHeight, document.body.scrollHeight];"
+SCROLL_JS = "window.scrollBy(0, arguments[0]); " + MEASURE_JS
+
+# number of resources the page has requested so far (see INSTRUMENT_JS for the buffer size)
+RESOURCE_COUNT_JS = "return performance.getEntriesByType('resource').length;"
+
 # for capturing js functions
 
 INSTRUMENT_JS = r"""
 (() => {
-  window._jsCalls = [];
+  // the default 250-entry resource timing buffer fills up on ad-heavy pages
+  performance.setResourceTimingBufferSize(100000);
+  // ring buffer: only the most recent MAX_CALLS calls are kept, so a page that
+  // polls for minutes can't grow it without bound
+  const MAX_CALLS = 5000, MAX_ARG = 1024;
+  const calls = new Array(MAX_CALLS);
+  let total = 0;
+  // JSON-safe copy of one argument; anything longer than MAX_ARG becomes a length marker
+  function clip(v) {
+    if (typeof v === 'function') return '<function>';
+    if (v !== null && typeof v === 'object') {
+      if (typeof Request !== 'undefined' && v instanceof Request) v = v.url;
+      else {
+        try { v = JSON.stringify(v); } catch (e) { v = String(v); }
+        if (v === undefined) v = '<unserializable>';
+      }
+    }
+    if (typeof v === 'string' && v.length > MAX_ARG) return `<${v.length} chars>`;
+    return v;
+  }
   // helper to wrap methods
   function wrap(obj, methodName) {
     const orig = obj[methodName];
     if (!orig) return;
     obj[methodName] = function(...args) {
       // record the call
-      window._jsCalls.push({ fn: methodName, args });
-      // also log to console so your console.json picks it up
-      console.log('JS_CALL', methodName, args);
+      calls[total++ % MAX_CALLS] = { fn: methodName, args: args.map(clip) };
       return orig.apply(this, args);
     };
   }
+  // hand back the buffered calls, oldest first, and empty the buffer
+  window._drainJsCalls = () => {
+    const out = [];
+    for (let i = Math.max(0, total - MAX_CALLS); i < total; i++) out.push(calls[i % MAX_CALLS]);
+    total = 0;
+    return out;
+  };
   // wrap fetch
   wrap(window, 'fetch');
   // wrap XHR open & send
@@ -64,79 +142,148 @@ def human_scroll(driver, max_scrolls=MAX_SCROLLS):
     Repeatedly scroll all the way to the bottom, up to max_scrolls times,
     breaking only once the viewport bottom >= total scrollHeight.
     """
+    total_height = driver.execute_script("return document.body.scrollHeight;")
     for i in range(max_scrolls):
-        # pick a human‐like scroll delta
+        # pick a human‐like scroll delta, scroll, and measure where the viewport
+        # bottom sits, all in one round trip
         delta = random.randint(200, 800)
-        driver.execute_script("window.scrollBy(0, arguments[0]);", delta)
-        
-        # wait a bit for lazy‐loaded content
-        time.sleep(random.uniform(0.5, 1.5))
-        
-        # measure where the viewport bottom sits
-        position     = driver.execute_script(
-            "return window.pageYOffset + window.innerHeight;"
-        )
-        total_height = driver.execute_script(
-            "return document.body.scrollHeight;"
-        )
-        
+        position, height = driver.execute_script(SCROLL_JS, delta)
+
+        # wait for lazy‐loaded content to grow the page, but no longer than SCROLL_WAIT
+        if height <= total_height:
+            def grown(d):
+                measured = d.execute_script(MEASURE_JS)
+                return measured if measured[1] > total_height else False
+            try:
+                position, height = WebDriverWait(driver, SCROLL_WAIT, poll_frequency=0.1).until(grown)
+            except TimeoutException:
+                pass
+        total_height = height
+
         # debug print (optional)
-        print(f"    scroll #{i+1}: +{delta}px → {position:.0f}/{total_height:.0f}")
+        logger.debug("    scroll #%d: +%dpx → %.0f/%.0f", i + 1, delta, position, total_height)
         
         # only stop once you've genuinely hit the end
         if position >= total_height:
-            print(f"    ↳ reached bottom after {i+1} scrolls")
+            logger.debug("    ↳ reached bottom after %d scrolls", i + 1)
             break
 
+def wait_for_network_idle(driver, quiet, max_wait):
+    """
+    Return once no new resource has started loading for `quiet` seconds,
+    or after max_wait seconds at most.
+    """
+    deadline = time.monotonic() + max_wait
+    count = driver.execute_script(RESOURCE_COUNT_JS)
+    idle_since = time.monotonic()
+    while True:
+        now = time.monotonic()
+        if now - idle_since >= quiet or now >= deadline:
+            return
+        time.sleep(0.25)
+        latest = driver.execute_script(RESOURCE_COUNT_JS)
+        if latest != count:
+            count, idle_since = latest, time.monotonic()
+
+def dump_json(obj, indent=False) -> bytes:
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def trim_headers(headers, cap=HEADER_CAP):
+    # set-cookie blobs, CSPs and data-URL echoes can run to kilobytes each;
+    # keep their length, not their content, unless the header is on the allowlist
+    return {k: (v if len(v) <= cap or k.lower() in KEEP_HEADERS else f"<trunc:{len(v)}>")
+            for k, v in headers.items()}
+
+def write_network_dump(out, name, obj):
+    # header-heavy JSON compresses several times over; plain .json when zstandard is missing
+    data = dump_json(obj)
+    if zstandard:
+        (out/f"{name}.json.zst").write_bytes(zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data))
+    else:
+        (out/f"{name}.json").write_bytes(data)
+
 def normalize_url(u: str) -> str:
     if not u.startswith(("http://", "https://")):
         return "https://" + u
     return u
 
 
-def crawl(url: str, idx: int):
+def make_options():
+    opts = Options()
+    for arg in CHROME_ARGS:
+        opts.add_argument(arg)
+    if BLOCK_MEDIA:
+        opts.add_argument("--blink-settings=imagesEnabled=false")
+    # per-site UA comes from Network.setUserAgentOverride; this is just the startup one
+    opts.add_argument(f"--user-agent={random.choice(USER_AGENTS)}")
+
+    # enable performance & browser logs
+    opts.set_capability("goog:loggingPrefs", {"performance": "ALL", "browser": "ALL"})
+    # only network events are parsed, so keep page lifecycle events out of the log buffer
+    opts.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    return opts
+
+
+def make_driver():
+    opts = make_options()
+    driver = start_chrome(opts)
+
+    # inject stealth script; both stay installed for every later page load
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": STEALTH_JS})
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": INSTRUMENT_JS})
+
+    # Blocked requests still show up in requestWillBeSent, so the logs keep their URLs.
+    # Ad and analytics scripts are what we are recording, so only media is blocked.
+    if BLOCK_MEDIA:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": MEDIA_URLS})
+    return driver
+
+
+def clear_site_state(driver):
+    # Leave the page and wipe what it stored, so the next site starts from a clean profile
+    parts = urlparse(driver.current_url)
+    driver.get("about:blank")
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+    if parts.scheme in ("http", "https"):
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin",
+                               {"origin": f"{parts.scheme}://{parts.netloc}", "storageTypes": "all"})
+    # Drain the log buffers so these entries don't show up in the next site's logs
+    driver.get_log("performance")
+    driver.get_log("browser")
+
+
+def crawl(driver, url: str, idx: int):
     # prepare per-site output folder
     url = normalize_url(url)
     safe = url.replace("://","_").replace("/","_")
     out  = OUT_DIR / f"{idx:04d}_{safe}"
     out.mkdir(exist_ok=True)
 
-    # pick UA and viewport
+    # pick UA and viewport for this site
     ua = random.choice(USER_AGENTS)
     w, h = random.choice([1200,1366,1440,1600]), random.choice([700,800,900,1000])
+    driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": ua})
+    driver.set_window_size(w, h)
 
-    # enable performance & browser logs
-    caps = DesiredCapabilities.CHROME.copy()
-    caps["goog:loggingPrefs"] = {"performance":"ALL", "browser":"ALL"}
+    try:
+        visit(driver, url, out)
+    finally:
+        clear_site_state(driver)
 
-    opts = Options()
-    opts.headless = False
-    opts.add_argument(f"--user-agent={ua}")
-    opts.add_argument(f"--window-size={w},{h}")
-    opts.add_argument("--disable-blink-features=AutomationControlled")
-    opts.add_argument("--no-sandbox")
-    opts.add_argument("--disable-infobars")
-    opts.add_argument("--incognito")
-
-    opts.set_capability("goog:loggingPrefs",
-    {
-        "performance": "ALL",
-        "browser": "ALL"
-    })
-
-    driver = webdriver.Chrome(service=Service(), options=opts)
-
-    # inject stealth script
-    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": STEALTH_JS})
-    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": INSTRUMENT_JS})
 
+def visit(driver, url, out):
     # navigate + human-like wait/scroll
     driver.get(url)
-    time.sleep(random.uniform(1.0,3.0))
+    wait_for_network_idle(driver, quiet=1.0, max_wait=3.0)
     human_scroll(driver)
-    dwell = random.uniform(5, 10)   # anywhere from 20s to 45s
-    print(f"  → waiting {dwell:.1f}s to let ads/iframes load…")
-    time.sleep(dwell)
+    logger.debug("  → waiting up to %.0fs to let ads/iframes load…", DWELL_MAX)
+    wait_for_network_idle(driver, quiet=NETWORK_QUIET, max_wait=DWELL_MAX)
 
     # collect logs
     perf = driver.get_log("performance")
@@ -146,38 +293,116 @@ def crawl(url: str, idx: int):
     # parse network events
     requests, responses = [], []
     for entry in perf:
-        msg = json.loads(entry["message"])["message"]
+        raw = entry["message"]
+        # most events are dataReceived/loadingFinished/etc.; skip them before paying for json.loads
+        if "Network.requestWillBeSent" not in raw and "Network.responseReceived" not in raw:
+            continue
+        msg = load_json(raw)["message"]
         m, p = msg.get("method"), msg.get("params", {})
         if m == "Network.requestWillBeSent":
-            req = {"url": p["request"]["url"], "method": p["request"]["method"], "headers": p["request"].get("headers",{})}
+            req = {"url": p["request"]["url"], "method": p["request"]["method"], "headers": trim_headers(p["request"].get("headers",{}))}
             if "postData" in p["request"]:
                 req["postData"] = p["request"]["postData"]
             requests.append(req)
         elif m == "Network.responseReceived":
-            res = {"url": p["response"]["url"], "status": p["response"]["status"], "headers": p["response"].get("headers",{})}
+            res = {"url": p["response"]["url"], "status": p["response"]["status"], "headers": trim_headers(p["response"].get("headers",{}))}
             responses.append(res)
 
     # parse console logs
     console_logs = [{"level": e["level"], "message": e["message"]} for e in brow]
-    js_calls = driver.execute_script("return window._jsCalls || []")
+    js_calls = driver.execute_script("return window._drainJsCalls ? window._drainJsCalls() : []")
 
 
     # write out JSON
-    (out/"requests.json").write_text(json.dumps(requests, indent=2))
-    (out/"responses.json").write_text(json.dumps(responses, indent=2))
-    (out/"console.json").write_text(json.dumps(console_logs, indent=2))
-    (out/"js_calls.json").write_text(json.dumps(js_calls,     indent=2))
+    # the network dumps are the big ones and nobody reads them by eye, so skip the indentation
+    write_network_dump(out, "requests", requests)
+    write_network_dump(out, "responses", responses)
+    (out/"console.json").write_bytes(dump_json(console_logs, indent=True))
+    (out/"js_calls.json").write_bytes(dump_json(js_calls,     indent=True))
 
-    driver.quit()
 
-if __name__ == "__main__":
+def init_worker(log_queue):
+    register_driver_cleanup()
+    # Hand log records to the main process instead of writing to a shared stdout
+    # (records are formatted by the listener's handlers, so only the bare message goes in)
+    logging.basicConfig(level=logging.INFO, format="%(message)s",
+                        handlers=[QueueHandler(log_queue)], force=True)
+
+
+def work(task):
+    # Returns "ok", "retried" or "failed" for the run summary
+    idx, url = task
+    try:
+        logger.info("[%04d] crawling %s …", idx, url)
+        # All of a site's URLs go to one worker (see main), so that worker gets the whole DOMAIN_RATE
+        wait_for_slot(normalize_url(url), 1 / DOMAIN_RATE)
+        try:
+            crawl(get_driver(make_driver), url, idx)
+            return "ok"
+        except InvalidSessionIdException:
+            logger.warning("  Lost browser session on %s, restarting driver", url)
+            reset_driver()
+            crawl(get_driver(make_driver), url, idx)
+            return "retried"
+    except Exception as e:
+        logger.error("  ✖ error on %s: %s", url, e)
+        return "failed"
+
+
+def work_site(tasks):
+    # One registered domain's URLs, crawled back to back by a single worker
+    return Counter(work(task) for task in tasks)
+
+
+def site_key(url):
+    host = urlparse(normalize_url(url)).hostname or ""
+    if tldextract:
+        return tldextract.extract(host).registered_domain or host
+    # Without the public suffix list, group by full hostname: www.x.com and cdn.x.com then get
+    # separate buckets, which beats merging every .co.uk or .com.au site into one serial bucket
+    return host
+
+
+def main():
+    # Bucket URLs by registered domain (eTLD+1), so www.x.com and cdn.x.com share a bucket
+    sites = {}
     with open(INPUT_CSV) as f:
         reader = csv.reader(f)
         for idx, row in enumerate(reader, start=1):
             # adjust here if your CSV has multiple columns (e.g. index,name)
-            url = row[1]
-            try:
-                print(f"[{idx:04d}] crawling {url} …")
-                crawl(url, idx)
-            except Exception as e:
-                print(f"  ✖ error on {url}: {e}")
+            sites.setdefault(site_key(row[1]), []).append((idx, row[1]))
+
+    # Each site spends most of its time in page loads and sleeps, and WebDriver is not
+    # thread-safe, so crawl several sites at once in separate processes. A bucket goes to
+    # one worker as a whole, so no two workers ever load the same site at the same time;
+    # the biggest buckets start first so they don't straggle at the end. Each worker
+    # reuses one Chrome for 20 buckets and is then replaced with a fresh one.
+    shards = sorted(sites.values(), key=len, reverse=True)
+
+    # Workers log through a queue; one listener here formats and writes every record
+    log_queue = Queue()
+    formatter = logging.Formatter("%(asctime)s %(processName)s %(levelname)s %(message)s")
+    handlers = [logging.StreamHandler(), logging.FileHandler(LOG_FILE, encoding="utf-8")]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    listener = QueueListener(log_queue, *handlers)
+    listener.start()
+
+    totals = Counter()
+    try:
+        with Pool(processes=WORKERS, initializer=init_worker, initargs=(log_queue,),
+                  maxtasksperchild=20) as pool:
+            for counts in pool.imap_unordered(work_site, shards):
+                totals.update(counts)
+            # Let workers exit normally so their drivers are quit
+            pool.close()
+            pool.join()
+    finally:
+        listener.stop()
+
+    print(f"Done: {totals['ok']} ok, {totals['retried']} ok after a driver restart, "
+          f"{totals['failed']} failed. Log in {LOG_FILE}")
+
+
+if __name__ == "__main__":
+    main()
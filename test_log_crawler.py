@@ -0,0 +1,57 @@
+import random
+# ahocorasick and hyperscan are None in log_crawler when the package is not installed
+from log_crawler import (load_list, compile_pattern, build_automaton, build_database, run_matcher,
+                         ahocorasick, hyperscan)
+
+ENTRIES = load_list("domains.txt") + load_list("functions.txt")
+# Glue between tokens: word bytes that extend an entry, and the separators seen in logs
+JOINERS = ["", " ", ".", "(", ")", "/", "_", "x", "\n", '"', "-", "é"]
+
+
+def build_matchers(entries):
+    # Every backend that is installed here; the regex one always is
+    matchers = {"regex": compile_pattern(entries)}
+    if ahocorasick:
+        matchers["automaton"] = build_automaton(entries)
+    if hyperscan:
+        matchers["hyperscan"] = build_database(entries)
+    return matchers
+
+
+def scan(matcher, text):
+    found = set()
+    run_matcher(matcher, text.encode("utf-8").lower(), found)
+    return {ENTRIES[i] for i in found}
+
+
+def random_log(rng, tokens=40):
+    parts = []
+    for _ in range(tokens):
+        parts.append(rng.choice(ENTRIES) if rng.random() < 0.6 else rng.choice(["foo", "Client", "messages", "API"]))
+        parts.append(rng.choice(JOINERS))
+    return "".join(parts)
+
+
+def test_longest_entry_wins():
+    for name, matcher in build_matchers(ENTRIES).items():
+        found = scan(matcher, "resp = client.messages.create(model=m)\n")
+        assert found == {"client.messages.create"}, (name, found)
+        found = scan(matcher, "client.messages.batches.list()\n")
+        assert found == {"client.messages.batches"}, (name, found)
+
+
+def test_backends_agree():
+    rng = random.Random(0)
+    matchers = build_matchers(ENTRIES)
+    for _ in range(2000):
+        text = random_log(rng)
+        results = {name: scan(matcher, text) for name, matcher in matchers.items()}
+        assert len({frozenset(r) for r in results.values()}) == 1, (text, results)
+
+
+# === Test it ===
+if __name__ == "__main__":
+    print("Backends:", ", ".join(build_matchers(ENTRIES)))
+    test_longest_entry_wins()
+    test_backends_agree()
+    print("All backends agree.")
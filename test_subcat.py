@@ -1,35 +1,38 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from chrome_driver import build_driver
+
+# Every subcategory link on a futurepedia category page, resolved to absolute URLs
+SUBCATEGORY_LINKS_JS = """
+return [...document.querySelectorAll("a.text-ice-500[href]")]
+    .map(a => a.href)
+    .filter(h => h.startsWith("https://www.futurepedia.io/ai-tools/"));
+"""
 
 def get_all_subcategory_links(driver, category_links):
     subcategory_links = []
+    seen_urls = set()
 
     for category_url in category_links:
         driver.get(category_url)
         try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a.text-ice-500[href]"))
-            )
-            anchors = driver.find_elements(By.CSS_SELECTOR, "a.text-ice-500[href]")
-            for anchor in anchors:
-                href = anchor.get_attribute("href")
-                if href and href.startswith("https://www.futurepedia.io/ai-tools/"):
-                    if href not in subcategory_links:
-                        subcategory_links.append(href)
+            # The links are in the server-rendered HTML (futurepedia_crawler reads them without
+            # a browser), so they are there once get() returns; one script call collects them all
+            hrefs = driver.execute_script(SUBCATEGORY_LINKS_JS)
         except Exception as e:
             print(f"Error loading subcategories for {category_url}: {e}")
             continue
+        if not hrefs:
+            print(f"No subcategories found on {category_url}")
+        for href in hrefs:
+            if href not in seen_urls:
+                subcategory_links.append(href)
+                seen_urls.add(href)
 
     return subcategory_links
 
 
 # === Test it ===
 if __name__ == "__main__":
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
+    driver = build_driver()
     try:
         test_category = ["https://www.futurepedia.io/ai-tools/productivity"]
         sub_links = get_all_subcategory_links(driver, test_category)